@@ -1,190 +1,635 @@
-# backend.py
-
-import psycopg2
-import pandas as pd
-from io import StringIO
-import os
-import re
-
-# Database connection details from environment variables or defaults
-DB_NAME = os.environ.get("DB_NAME", "customer_db")
-DB_USER = os.environ.get("DB_USER", "postgres")
-DB_PASSWORD = os.environ.get("DB_PASSWORD", "KaliNew")
-DB_HOST = os.environ.get("DB_HOST", "localhost")
-DB_PORT = os.environ.get("DB_PORT", "5432")
-
-def get_db_connection():
-    """Establishes and returns a connection to the PostgreSQL database."""
-    try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        print(f"Error connecting to database: {e}")
-        return None
-
-def sanitize_column_name(col_name):
-    """Sanitizes a string to be a valid PostgreSQL column name."""
-    col_name = col_name.lower().replace(' ', '_')
-    col_name = re.sub(r'[^a-z0-9_]', '', col_name)
-    return f'"{col_name}"'
-
-def infer_sql_type(col_series):
-    """Infers the best PostgreSQL data type for a pandas Series."""
-    if pd.api.types.is_numeric_dtype(col_series):
-        if pd.api.types.is_integer_dtype(col_series):
-            return "INTEGER"
-        else:
-            return "DECIMAL"
-    elif pd.api.types.is_datetime64_any_dtype(col_series):
-        return "TIMESTAMP"
-    else:
-        # Default to TEXT for strings and other types
-        return "TEXT"
-
-# --- CRUD Principles ---
-
-# CREATE (Data Ingestion)
-def ingest_csv_data(df, table_name="customer_data"):
-    """
-    Dynamically creates a table in the database from a DataFrame and
-    ingests the data. It will overwrite any existing table with the same name.
-    """
-    conn = get_db_connection()
-    if conn is None: return False
-
-    try:
-        cursor = conn.cursor()
-        sanitized_table_name = sanitize_column_name(table_name).strip('"')
-
-        # Drop table if it exists
-        cursor.execute(f"DROP TABLE IF EXISTS {sanitized_table_name};")
-        conn.commit()
-
-        # Generate SQL for table creation
-        schema_sql = []
-        df.columns = [sanitize_column_name(col) for col in df.columns]
-        for col, dtype in zip(df.columns, df.dtypes):
-            sql_type = infer_sql_type(df[col])
-            schema_sql.append(f"{col} {sql_type}")
-        
-        create_table_query = f"CREATE TABLE {sanitized_table_name} ({', '.join(schema_sql)});"
-        cursor.execute(create_table_query)
-        conn.commit()
-        
-        # Load data using COPY FROM
-        buffer = StringIO()
-        # Drop the " from column names for to_csv
-        df.columns = [col.strip('"') for col in df.columns]
-        df.to_csv(buffer, index=False, header=False, sep='\t')
-        buffer.seek(0)
-        
-        cursor.copy_from(buffer, sanitized_table_name, sep='\t')
-        conn.commit()
-        
-        print(f"Data successfully ingested into table '{sanitized_table_name}'.")
-        return True
-    except Exception as e:
-        conn.rollback()
-        print(f"Error during data ingestion: {e}")
-        return False
-    finally:
-        if conn: cursor.close(); conn.close()
-
-# READ (Data Retrieval & Analysis)
-def get_all_data(table_name="customer_data"):
-    """Fetches all data from the specified table."""
-    conn = get_db_connection()
-    if conn is None: return pd.DataFrame()
-    
-    try:
-        sanitized_table_name = sanitize_column_name(table_name).strip('"')
-        query = f"SELECT * FROM {sanitized_table_name};"
-        df = pd.read_sql(query, conn)
-        return df
-    except Exception as e:
-        print(f"Error fetching data: {e}")
-        return pd.DataFrame()
-    finally:
-        if conn: conn.close()
-
-def get_data_by_filters(query):
-    """Executes a custom query to retrieve filtered data."""
-    conn = get_db_connection()
-    if conn is None: return pd.DataFrame()
-    
-    try:
-        df = pd.read_sql(query, conn)
-        return df
-    except Exception as e:
-        print(f"Error fetching filtered data: {e}")
-        return pd.DataFrame()
-    finally:
-        if conn: conn.close()
-
-def get_key_metrics(df):
-    """
-    Calculates key business metrics from a DataFrame.
-    Assumes columns: 'customer_id', 'purchase_date', 'purchase_amount'.
-    """
-    if df.empty:
-        return {'LTV': 0, 'CAC': 0, 'Churn_Rate': 0}
-
-    # Simulate CAC and Churn Rate based on available data
-    # In a real-world scenario, this data would come from different tables.
-    total_customers = df['customer_id'].nunique()
-    total_revenue = df['purchase_amount'].sum()
-    
-    # Simplified LTV Calculation
-    avg_purchase_value = df.groupby('customer_id')['purchase_amount'].mean().mean()
-    customer_lifespan_days = (df['purchase_date'].max() - df['purchase_date'].min()).days
-    avg_purchases_per_customer = df.shape[0] / total_customers
-    ltv = (avg_purchase_value * avg_purchases_per_customer) * (customer_lifespan_days / 365)
-
-    # Simplified CAC Calculation (assuming first purchase is acquisition)
-    new_customers = df.groupby('customer_id')['purchase_date'].min().reset_index()
-    cac = total_revenue / total_customers
-
-    # Simplified Churn Rate (assuming no repeat purchase within a period implies churn)
-    # This is a very basic proxy and should be refined with real data.
-    latest_date = df['purchase_date'].max()
-    churned_customers = df[df['purchase_date'] < (latest_date - pd.Timedelta(days=365))]['customer_id'].nunique()
-    churn_rate = (churned_customers / total_customers) * 100
-
-    return {
-        'LTV': f"{ltv:,.2f}",
-        'CAC': f"{cac:,.2f}",
-        'Churn_Rate': f"{churn_rate:,.2f}%"
-    }
-
-def get_business_insights(df):
-    """Provides key business insights using aggregation functions."""
-    if df.empty:
-        return {}
-    
-    insights = {}
-    
-    # COUNT
-    total_customers = df['customer_id'].nunique()
-    insights['Total_Customers'] = total_customers
-    
-    # SUM
-    total_revenue = df['purchase_amount'].sum()
-    insights['Total_Revenue'] = f"{total_revenue:,.2f}"
-    
-    # AVG
-    avg_purchase_amount = df['purchase_amount'].mean()
-    insights['Average_Purchase_Amount'] = f"{avg_purchase_amount:,.2f}"
-    
-    # MIN/MAX
-    min_purchase = df['purchase_amount'].min()
-    max_purchase = df['purchase_amount'].max()
-    insights['Min_Purchase'] = f"{min_purchase:,.2f}"
-    insights['Max_Purchase'] = f"{max_purchase:,.2f}"
-
-    return insights
\ No newline at end of file
+# backend.py
+
+import psycopg2
+import psycopg2.pool
+import pandas as pd
+import numpy as np
+import os
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# connectorx fetches query results as Arrow columns and hands them to pandas
+# without building per-row Python tuples; fall back to pd.read_sql if absent.
+try:
+    import connectorx
+except ImportError:
+    connectorx = None
+
+# ADBC streams an Arrow table straight through PostgreSQL's binary COPY
+# protocol, including the CREATE TABLE; fall back to our own COPY if absent.
+try:
+    import pyarrow as pa
+    import adbc_driver_postgresql.dbapi as adbc_pg
+except ImportError:
+    adbc_pg = None
+
+# Polars fuses independent reductions into one streaming columnar pass;
+# fall back to per-reduction pandas scans if absent.
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# PostgreSQL binary COPY framing: signature + flags + header-extension length,
+# and the sentinel used for NULL fields (length = -1).
+_PG_COPY_HEADER = b"PGCOPY\n\xff\r\n\0" + struct.pack('>ii', 0, 0)
+_PG_COPY_TRAILER = struct.pack('>h', -1)
+_PG_NULL = struct.pack('>i', -1)
+# PostgreSQL timestamps count microseconds from 2000-01-01, not the Unix epoch.
+_PG_EPOCH_US = 946_684_800_000_000
+
+# COPY streams move through the pipe in 64KB blocks: large enough to keep
+# libpq's send loop fed with full buffers instead of per-field writes.
+_COPY_BUFFER_SIZE = 64 * 1024
+
+# Database connection details from environment variables or defaults
+DB_NAME = os.environ.get("DB_NAME", "customer_db")
+DB_USER = os.environ.get("DB_USER", "postgres")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "KaliNew")
+DB_HOST = os.environ.get("DB_HOST", "localhost")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+
+# Connection URI for connectorx, built once at import.
+_CONN_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Local columnar cache of ingested tables for the dashboard read path.
+_PARQUET_CACHE_DIR = ".cache"
+
+def _parquet_cache_path(sanitized_table_name):
+    """Returns the Parquet cache file path for a sanitized table name."""
+    return os.path.join(_PARQUET_CACHE_DIR, f"{sanitized_table_name}.parquet")
+
+# Connections are pooled so Streamlit reruns reuse an open connection
+# instead of paying a full TCP/auth handshake per widget interaction.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool():
+    """Creates the connection pool on first use and returns it."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = psycopg2.pool.ThreadedConnectionPool(
+                    1, 8,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    host=DB_HOST,
+                    port=DB_PORT
+                )
+    return _POOL
+
+def get_db_connection():
+    """Checks a connection out of the pool and returns it."""
+    try:
+        return _get_pool().getconn()
+    except psycopg2.OperationalError as e:
+        print(f"Error connecting to database: {e}")
+        return None
+
+def release_connection(conn):
+    """Returns a connection to the pool for reuse."""
+    _get_pool().putconn(conn)
+
+@contextmanager
+def pooled_conn():
+    """Context manager that checks out a pooled connection and returns it on exit."""
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            release_connection(conn)
+
+# Compiled once at import so wide tables don't pay a regex compile (and a
+# chained .replace() pass) per column.
+_SANITIZE_RE = re.compile(r'[^a-z0-9_]')
+_SPACE_TO_UNDERSCORE = str.maketrans({' ': '_'})
+
+# Column names that almost certainly hold dates; matched at ingest so the
+# values are parsed once and stored as native TIMESTAMP.
+_DATE_HINT = re.compile(r'(date|_at|timestamp)$', re.I)
+
+def sanitize_column_name(col_name):
+    """Sanitizes a string to be a valid PostgreSQL column name."""
+    return '"' + _SANITIZE_RE.sub('', col_name.lower().translate(_SPACE_TO_UNDERSCORE)) + '"'
+
+# (dtype.kind, itemsize) -> PostgreSQL type, matching the wire formats used
+# by the binary COPY path below. Downcast columns map to the compact types
+# (SMALLINT/REAL) instead of always paying for 8-byte columns. Anything
+# unknown (objects, strings) is TEXT.
+_KIND_TO_SQL = {
+    ('b', 1): 'BOOLEAN',
+    ('i', 1): 'SMALLINT',
+    ('i', 2): 'SMALLINT',
+    ('i', 4): 'INTEGER',
+    ('i', 8): 'BIGINT',
+    ('u', 1): 'SMALLINT',
+    ('u', 2): 'INTEGER',
+    ('u', 4): 'BIGINT',
+    ('u', 8): 'BIGINT',
+    ('f', 4): 'REAL',
+    ('f', 8): 'DOUBLE PRECISION',
+    ('M', 8): 'TIMESTAMP',
+}
+
+# Binary COPY wire format per integer dtype: a field must be exactly as
+# wide as the declared column type, so unsigned widths round up.
+_INT_WIRE = {
+    ('i', 1): '>i2', ('i', 2): '>i2', ('i', 4): '>i4', ('i', 8): '>i8',
+    ('u', 1): '>i2', ('u', 2): '>i4', ('u', 4): '>i8', ('u', 8): '>i8',
+}
+
+def infer_sql_type(dtype):
+    """Maps a NumPy/pandas dtype to the matching PostgreSQL column type."""
+    key = (getattr(dtype, 'kind', 'O'), getattr(dtype, 'itemsize', 0))
+    return _KIND_TO_SQL.get(key, 'TEXT')
+
+def _encode_pg_column(col_series):
+    """
+    Encodes a Series into a list of length-prefixed binary COPY fields,
+    one bytes object per row. Numeric and datetime columns are byteswapped
+    to big-endian in one vectorized pass per column.
+    """
+    dtype = col_series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        prefix = struct.pack('>i', 1)
+        return [prefix + (b'\x01' if v else b'\x00')
+                for v in col_series.to_numpy()]
+    elif pd.api.types.is_integer_dtype(dtype):
+        wire = _INT_WIRE[(dtype.kind, dtype.itemsize)]
+        data = np.ascontiguousarray(col_series.to_numpy(), dtype=wire)
+        # Slice fields out of the array buffer: scalars extracted from a
+        # big-endian array come back in *native* order, so per-scalar
+        # .tobytes() would silently undo the byteswap.
+        n = data.dtype.itemsize
+        prefix = struct.pack('>i', n)
+        buf = data.tobytes()
+        return [prefix + buf[i:i + n] for i in range(0, len(buf), n)]
+    elif pd.api.types.is_float_dtype(dtype):
+        wire = '>f4' if dtype.itemsize == 4 else '>f8'
+        data = np.ascontiguousarray(col_series.to_numpy(), dtype=wire)
+        n = data.dtype.itemsize
+        prefix = struct.pack('>i', n)
+        buf = data.tobytes()
+        nulls = col_series.isna().to_numpy()
+        return [_PG_NULL if isnull else prefix + buf[i * n:i * n + n]
+                for i, isnull in enumerate(nulls)]
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        prefix = struct.pack('>i', 8)
+        nanos = col_series.to_numpy(dtype='datetime64[ns]').view('int64')
+        micros = np.ascontiguousarray(nanos // 1000 - _PG_EPOCH_US, dtype='>i8')
+        buf = micros.tobytes()
+        nulls = col_series.isna().to_numpy()
+        return [_PG_NULL if isnull else prefix + buf[i * 8:i * 8 + 8]
+                for i, isnull in enumerate(nulls)]
+    else:
+        fields = []
+        for v in col_series:
+            if pd.isna(v):
+                fields.append(_PG_NULL)
+            else:
+                raw = str(v).encode('utf-8')
+                fields.append(struct.pack('>i', len(raw)) + raw)
+        return fields
+
+# Rows are encoded and written in blocks of this size, so only one block's
+# worth of encoded fields is ever held in RAM and encoding of later blocks
+# overlaps the network transfer of earlier ones.
+_COPY_BLOCK_ROWS = 50_000
+
+def _write_pg_binary(df, out):
+    """Writes a DataFrame as a PostgreSQL binary COPY stream to a file object."""
+    out.write(_PG_COPY_HEADER)
+    field_count = struct.pack('>h', len(df.columns))
+    for start in range(0, len(df), _COPY_BLOCK_ROWS):
+        block = df.iloc[start:start + _COPY_BLOCK_ROWS]
+        encoded_columns = [_encode_pg_column(block[col]) for col in block.columns]
+        for row_fields in zip(*encoded_columns):
+            out.write(field_count)
+            for field in row_fields:
+                out.write(field)
+    out.write(_PG_COPY_TRAILER)
+
+# --- CRUD Principles ---
+
+# Dashboard group-by columns that get an index at ingest so the aggregate
+# queries can use index-only scans.
+_DASHBOARD_INDEX_COLUMNS = ('region', 'customer_segment', 'acquisition_channel')
+
+def _mirror_parquet_cache(df, sanitized_table_name):
+    """
+    Mirrors the ingested table to a local Parquet file so dashboard reads
+    can skip the SELECT * round-trip entirely. A cache-write failure
+    (e.g. pyarrow missing) must not fail the ingest.
+    """
+    try:
+        os.makedirs(_PARQUET_CACHE_DIR, exist_ok=True)
+        df.to_parquet(_parquet_cache_path(sanitized_table_name),
+                      compression='zstd', engine='pyarrow')
+    except Exception as e:
+        print(f"Warning: could not write Parquet cache: {e}")
+
+# Below this column count the thread-pool startup costs more than the
+# per-column work it spreads out.
+_PARALLEL_PREPROCESS_MIN_COLS = 16
+
+def _preprocess_column(name, series):
+    """
+    Applies the per-column ingest coercions: date parsing for date-hinted
+    text columns and numeric downcasting. Returns the (possibly new) Series.
+    """
+    kind = series.dtype.kind
+    if kind == 'O' and _DATE_HINT.search(name):
+        # cache=True dedupes repeated date strings.
+        return pd.to_datetime(series, errors='coerce', cache=True, format='mixed')
+    if kind in 'iu':
+        return pd.to_numeric(series, downcast='integer')
+    if kind == 'f':
+        return pd.to_numeric(series, downcast='float')
+    return series
+
+def _cluster_by_customer(cursor, sanitized_table_name):
+    """
+    Indexes and clusters the table on (customer_id, purchase_date) so the
+    heap keeps the same run-length-contiguous order the rows were loaded
+    in, which later GROUP BY customer_id scans read sequentially.
+    """
+    index_name = f"{sanitized_table_name}_customer_date_idx"
+    cursor.execute(
+        f"CREATE INDEX {index_name} ON {sanitized_table_name} (customer_id, purchase_date);"
+    )
+    cursor.execute(f"CLUSTER {sanitized_table_name} USING {index_name};")
+
+def _ingest_via_adbc(df, sanitized_table_name):
+    """
+    Pushes the DataFrame through ADBC's Arrow-native ingest: the already
+    columnar buffers stream over binary COPY, and ADBC emits the matching
+    CREATE TABLE itself. Returns False so callers can fall back to the
+    psycopg2 COPY path if anything goes wrong.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with adbc_pg.connect(_CONN_URI) as conn:
+            with conn.cursor() as cursor:
+                cursor.adbc_ingest(sanitized_table_name, table, mode='replace')
+                for index_col in _DASHBOARD_INDEX_COLUMNS:
+                    if index_col in df.columns:
+                        cursor.execute(f"CREATE INDEX ON {sanitized_table_name} ({index_col});")
+                if 'customer_id' in df.columns and 'purchase_date' in df.columns:
+                    _cluster_by_customer(cursor, sanitized_table_name)
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"ADBC ingest failed, falling back to binary COPY: {e}")
+        return False
+
+# CREATE (Data Ingestion)
+def ingest_csv_data(df, table_name="customer_data"):
+    """
+    Dynamically creates a table in the database from a DataFrame and
+    ingests the data. It will overwrite any existing table with the same name.
+    """
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+
+    # Per-column coercions: date-hinted text columns are parsed once so they
+    # land in the table as TIMESTAMP, and numeric columns are downcast so
+    # the schema map picks SMALLINT/INTEGER/REAL over BIGINT/DOUBLE
+    # PRECISION, roughly halving the COPY payload and on-disk row size.
+    # The columns are independent and pandas releases the GIL in the
+    # underlying C loops, so wide frames fan the work out across threads.
+    columns = list(df.columns)
+    if len(columns) >= _PARALLEL_PREPROCESS_MIN_COLS:
+        with ThreadPoolExecutor() as pool:
+            coerced = list(pool.map(_preprocess_column, columns,
+                                    (df[col] for col in columns)))
+    else:
+        coerced = [_preprocess_column(col, df[col]) for col in columns]
+    for col, series in zip(columns, coerced):
+        df[col] = series
+
+    # One pass over the columns builds both the quoted names (for DDL) and
+    # the unquoted names (for the DataFrame itself).
+    quoted_columns = [sanitize_column_name(col) for col in df.columns]
+    df.columns = [col[1:-1] for col in quoted_columns]
+
+    # Load rows already ordered by (customer_id, purchase_date): grouped
+    # aggregations over sorted input hit the contiguous-runs fast path
+    # instead of a hash table. mergesort keeps equal keys stable.
+    if 'customer_id' in df.columns and 'purchase_date' in df.columns:
+        df = df.sort_values(['customer_id', 'purchase_date'],
+                            kind='mergesort', ignore_index=True)
+
+    # Arrow-native fast path when the ADBC driver is installed.
+    if adbc_pg is not None and _ingest_via_adbc(df, sanitized_table_name):
+        _mirror_parquet_cache(df, sanitized_table_name)
+        print(f"Data successfully ingested into table '{sanitized_table_name}'.")
+        return True
+
+    conn = get_db_connection()
+    if conn is None: return False
+
+    try:
+        # One transaction covers the whole drop/create/copy sequence: a
+        # single WAL flush at commit instead of one per statement group,
+        # and the table swap stays atomic. The outer `with conn` commits
+        # on success and rolls back on exception.
+        with conn:
+            with conn.cursor() as cursor:
+                # Drop table if it exists
+                cursor.execute(f"DROP TABLE IF EXISTS {sanitized_table_name};")
+
+                # Generate SQL for table creation
+                schema_sql = []
+                for quoted, dtype in zip(quoted_columns, df.dtypes):
+                    schema_sql.append(f"{quoted} {infer_sql_type(dtype)}")
+
+                create_table_query = f"CREATE TABLE {sanitized_table_name} ({', '.join(schema_sql)});"
+                cursor.execute(create_table_query)
+
+                # Safe for bulk ingest: the whole table lands atomically,
+                # so skipping the synchronous fsync wait risks nothing.
+                cursor.execute("SET LOCAL synchronous_commit = OFF;")
+
+                # Load data using binary COPY: no text formatting on our
+                # side and no text parsing on the server's. Serialization
+                # runs in a writer thread feeding a pipe so it overlaps the
+                # network transfer instead of materializing the whole
+                # payload in RAM first.
+                read_fd, write_fd = os.pipe()
+                reader = os.fdopen(read_fd, 'rb', buffering=_COPY_BUFFER_SIZE)
+
+                def _produce():
+                    writer = os.fdopen(write_fd, 'wb', buffering=_COPY_BUFFER_SIZE)
+                    try:
+                        _write_pg_binary(df, writer)
+                    finally:
+                        writer.close()
+
+                producer = threading.Thread(target=_produce)
+                producer.start()
+                try:
+                    cursor.copy_expert(
+                        f"COPY {sanitized_table_name} FROM STDIN WITH (FORMAT BINARY)",
+                        reader
+                    )
+                finally:
+                    reader.close()
+                    producer.join()
+
+                # Indexes go in after the bulk load so COPY skips per-row
+                # index maintenance and each index is built in one pass.
+                for index_col in _DASHBOARD_INDEX_COLUMNS:
+                    if index_col in df.columns:
+                        cursor.execute(f"CREATE INDEX ON {sanitized_table_name} ({index_col});")
+
+                # Record the load order on disk so PostgreSQL keeps it.
+                if 'customer_id' in df.columns and 'purchase_date' in df.columns:
+                    _cluster_by_customer(cursor, sanitized_table_name)
+
+        _mirror_parquet_cache(df, sanitized_table_name)
+
+        print(f"Data successfully ingested into table '{sanitized_table_name}'.")
+        return True
+    except Exception as e:
+        print(f"Error during data ingestion: {e}")
+        return False
+    finally:
+        release_connection(conn)
+
+# READ (Data Retrieval & Analysis)
+def get_all_data(table_name="customer_data"):
+    """Fetches all data from the specified table."""
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+    query = f"SELECT * FROM {sanitized_table_name}"
+
+    # Prefer the Arrow-based transport: columnar buffers go straight into
+    # the DataFrame instead of a Python tuple per row.
+    if connectorx is not None:
+        try:
+            return connectorx.read_sql(_CONN_URI, query, return_type="pandas")
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            return pd.DataFrame()
+
+    conn = get_db_connection()
+    if conn is None: return pd.DataFrame()
+
+    try:
+        df = pd.read_sql(query, conn)
+        return df
+    except Exception as e:
+        print(f"Error fetching data: {e}")
+        return pd.DataFrame()
+    finally:
+        if conn: release_connection(conn)
+
+def get_all_data_parquet(table_name="customer_data"):
+    """
+    Fetches all data from the local Parquet cache if one exists, falling
+    back to the database otherwise. Parquet decodes straight into Arrow
+    column buffers, skipping PostgreSQL row materialization entirely.
+    """
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+    cache_path = _parquet_cache_path(sanitized_table_name)
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path, engine='pyarrow')
+        except Exception as e:
+            print(f"Error reading Parquet cache: {e}")
+    return get_all_data(table_name)
+
+def get_data_by_filters(query):
+    """Executes a custom query to retrieve filtered data."""
+    conn = get_db_connection()
+    if conn is None: return pd.DataFrame()
+    
+    try:
+        df = pd.read_sql(query, conn)
+        return df
+    except Exception as e:
+        print(f"Error fetching filtered data: {e}")
+        return pd.DataFrame()
+    finally:
+        if conn: release_connection(conn)
+
+def _read_aggregate(query):
+    """Runs a small aggregate query and returns the result as a DataFrame."""
+    with pooled_conn() as conn:
+        if conn is None: return pd.DataFrame()
+        try:
+            return pd.read_sql(query, conn)
+        except Exception as e:
+            print(f"Error fetching aggregated data: {e}")
+            return pd.DataFrame()
+
+def revenue_by_region(table_name="customer_data"):
+    """Total revenue per region, aggregated by PostgreSQL."""
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+    return _read_aggregate(
+        f"SELECT region, SUM(purchase_amount) AS purchase_amount "
+        f"FROM {sanitized_table_name} GROUP BY region;"
+    )
+
+def avg_by_segment(table_name="customer_data"):
+    """Average purchase amount per customer segment, aggregated by PostgreSQL."""
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+    return _read_aggregate(
+        f"SELECT customer_segment, AVG(purchase_amount) AS purchase_amount "
+        f"FROM {sanitized_table_name} GROUP BY customer_segment;"
+    )
+
+def count_by_channel(table_name="customer_data"):
+    """Distinct customer count per acquisition channel, aggregated by PostgreSQL."""
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+    return _read_aggregate(
+        f"SELECT acquisition_channel, COUNT(DISTINCT customer_id) AS customer_id "
+        f"FROM {sanitized_table_name} GROUP BY acquisition_channel;"
+    )
+
+def get_key_metrics_sql(table_name="customer_data"):
+    """
+    Computes the key business metrics inside PostgreSQL, mirroring
+    get_key_metrics but returning a one-row aggregate instead of pulling
+    the whole table to the client first.
+    """
+    empty = {'LTV': 0, 'CAC': 0, 'Churn_Rate': 0}
+    sanitized_table_name = sanitize_column_name(table_name).strip('"')
+    query = f"""
+        WITH per_customer AS (
+            SELECT customer_id,
+                   SUM(purchase_amount) AS total_amount,
+                   AVG(purchase_amount) AS avg_amount,
+                   MIN(purchase_date)   AS first_purchase,
+                   MAX(purchase_date)   AS last_purchase,
+                   COUNT(*)             AS n_purchases
+            FROM {sanitized_table_name}
+            GROUP BY customer_id
+        )
+        SELECT COUNT(*)                 AS n_customers,
+               SUM(total_amount)        AS total_revenue,
+               AVG(avg_amount)          AS avg_purchase_value,
+               MIN(first_purchase)      AS first_date,
+               MAX(last_purchase)       AS last_date,
+               SUM(n_purchases)         AS n_rows,
+               COUNT(*) FILTER (
+                   WHERE last_purchase <
+                       (SELECT MAX(last_purchase) - INTERVAL '365 days'
+                        FROM per_customer)
+               )                        AS churned
+        FROM per_customer;
+    """
+
+    with pooled_conn() as conn:
+        if conn is None: return empty
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            row = cursor.fetchone()
+            cursor.close()
+        except Exception as e:
+            print(f"Error computing key metrics: {e}")
+            return empty
+
+    n_customers, total_revenue, avg_purchase_value, first_date, last_date, n_rows, churned = row
+    if not n_customers:
+        return empty
+
+    customer_lifespan_days = (last_date - first_date).days
+    avg_purchases_per_customer = n_rows / n_customers
+    ltv = (float(avg_purchase_value) * avg_purchases_per_customer) * (customer_lifespan_days / 365)
+    cac = float(total_revenue) / n_customers
+    churn_rate = (churned / n_customers) * 100
+
+    # Raw floats, not formatted strings: cache-friendly and usable in
+    # follow-up computations. Presentation formatting happens at render.
+    return {'LTV': ltv, 'CAC': cac, 'Churn_Rate': churn_rate}
+
+def get_key_metrics(df):
+    """
+    Calculates key business metrics from a DataFrame.
+    Assumes columns: 'customer_id', 'purchase_date', 'purchase_amount'.
+    """
+    if df.empty:
+        return {'LTV': 0, 'CAC': 0, 'Churn_Rate': 0}
+
+    # Simulate CAC and Churn Rate based on available data
+    # In a real-world scenario, this data would come from different tables.
+    # One grouped pass yields every per-customer statistic the metrics
+    # need, instead of re-scanning the full columns per metric.
+    per_customer = df.groupby('customer_id', sort=False, observed=True).agg(
+        total_amount=('purchase_amount', 'sum'),
+        avg_amount=('purchase_amount', 'mean'),
+        first_purchase=('purchase_date', 'min'),
+        last_purchase=('purchase_date', 'max'),
+    )
+    total_customers = len(per_customer)
+    total_revenue = per_customer['total_amount'].sum()
+    latest_date = per_customer['last_purchase'].max()
+
+    # Simplified LTV Calculation
+    avg_purchase_value = per_customer['avg_amount'].mean()
+    customer_lifespan_days = (latest_date - per_customer['first_purchase'].min()).days
+    avg_purchases_per_customer = df.shape[0] / total_customers
+    ltv = (avg_purchase_value * avg_purchases_per_customer) * (customer_lifespan_days / 365)
+
+    # Simplified CAC Calculation (assuming first purchase is acquisition)
+    cac = total_revenue / total_customers
+
+    # Simplified Churn Rate (assuming no repeat purchase within a period implies churn)
+    # This is a very basic proxy and should be refined with real data.
+    # Comparing the per-customer last purchase against the cutoff is an
+    # O(unique customers) reduce — no boolean mask or filtered copy of
+    # the full frame is ever allocated.
+    churned_customers = int((per_customer['last_purchase'] < (latest_date - pd.Timedelta(days=365))).sum())
+    churn_rate = (churned_customers / total_customers) * 100
+
+    # Raw floats, not formatted strings: cache-friendly and usable in
+    # follow-up computations. Presentation formatting happens at render.
+    return {'LTV': ltv, 'CAC': cac, 'Churn_Rate': churn_rate}
+
+def get_business_insights(df):
+    """Provides key business insights using aggregation functions."""
+    if df.empty:
+        return {}
+
+    if pl is not None:
+        # One lazy select fuses COUNT(DISTINCT)/SUM/AVG/MIN/MAX into a
+        # single streaming pass over the two columns.
+        row = (
+            pl.from_pandas(df[['customer_id', 'purchase_amount']])
+            .lazy()
+            .select(
+                pl.col('customer_id').n_unique().alias('total_customers'),
+                pl.col('purchase_amount').sum().alias('total_revenue'),
+                pl.col('purchase_amount').mean().alias('avg_purchase'),
+                pl.col('purchase_amount').min().alias('min_purchase'),
+                pl.col('purchase_amount').max().alias('max_purchase'),
+            )
+            .collect()
+            .to_dicts()[0]
+        )
+        total_customers = row['total_customers']
+        total_revenue = row['total_revenue']
+        avg_purchase_amount = row['avg_purchase']
+        min_purchase = row['min_purchase']
+        max_purchase = row['max_purchase']
+    else:
+        # COUNT / SUM / AVG / MIN / MAX
+        total_customers = df['customer_id'].nunique()
+        total_revenue = df['purchase_amount'].sum()
+        avg_purchase_amount = df['purchase_amount'].mean()
+        min_purchase = df['purchase_amount'].min()
+        max_purchase = df['purchase_amount'].max()
+
+    return {
+        'Total_Customers': total_customers,
+        'Total_Revenue': total_revenue,
+        'Average_Purchase_Amount': avg_purchase_amount,
+        'Min_Purchase': min_purchase,
+        'Max_Purchase': max_purchase,
+    }
\ No newline at end of file
@@ -3,7 +3,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from backend import ingest_csv_data, get_all_data, get_business_insights, get_key_metrics
+from backend import (
+    ingest_csv_data,
+    get_all_data_parquet,
+    get_business_insights,
+    get_key_metrics_sql,
+    revenue_by_region,
+    avg_by_segment,
+    count_by_channel,
+)
 import os
 
 # Set page configuration
@@ -67,12 +75,18 @@ elif page == "Analytics Dashboard":
     st.title("📈 Customer Analytics Dashboard")
     
     # Cache all data for performance
-    @st.cache_data(ttl=3600)
+    @st.cache_data(ttl=3600, max_entries=2, show_spinner=False)
     def get_cached_data():
-        df = get_all_data()
-        # FIX: Convert the 'purchase_date' column to datetime here.
-        if 'purchase_date' in df.columns:
-            df['purchase_date'] = pd.to_datetime(df['purchase_date'])
+        # Reads the local Parquet mirror written at ingest; falls back to
+        # PostgreSQL when no cache file exists. Date columns arrive as
+        # datetime64 already — ingest stores them as TIMESTAMP.
+        df = get_all_data_parquet()
+        # Low-cardinality string columns become categoricals so any
+        # grouping hashes small integer codes instead of Python strings,
+        # and the cached frame shrinks accordingly.
+        for col in ('region', 'customer_segment', 'acquisition_channel'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         return df
 
     df_data = get_cached_data()
@@ -85,15 +99,21 @@ elif page == "Analytics Dashboard":
         # --- Key Metrics Section ---
         st.subheader("Key Business Metrics")
         try:
-            # The get_key_metrics function will now receive a DataFrame with a proper datetime column
-            metrics = get_key_metrics(df_data)
+            # Metrics are aggregated inside PostgreSQL: only a one-row
+            # result crosses the wire, not the whole table.
+            @st.cache_data(ttl=3600)
+            def get_cached_metrics():
+                return get_key_metrics_sql()
+
+            metrics = get_cached_metrics()
+            # The backend returns raw floats; formatting is presentation-only.
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Customer Lifetime Value (LTV)", metrics.get('LTV'))
+                st.metric("Customer Lifetime Value (LTV)", f"{metrics.get('LTV', 0):,.2f}")
             with col2:
-                st.metric("Customer Acquisition Cost (CAC)", metrics.get('CAC'))
+                st.metric("Customer Acquisition Cost (CAC)", f"{metrics.get('CAC', 0):,.2f}")
             with col3:
-                st.metric("Churn Rate", metrics.get('Churn_Rate'))
+                st.metric("Churn Rate", f"{metrics.get('Churn_Rate', 0):,.2f}%")
         except KeyError:
             st.error("Missing required columns for metrics calculation (e.g., 'customer_id', 'purchase_date', 'purchase_amount').")
         
@@ -106,17 +126,31 @@ elif page == "Analytics Dashboard":
             ["Total Revenue by Region", "Average Purchase by Segment", "Min/Max Purchase Amount", "Customer Count by Channel"]
         )
 
+        # Each aggregation runs as a GROUP BY in PostgreSQL and returns a
+        # K-row result, instead of re-grouping the full table in pandas.
+        @st.cache_data(ttl=3600)
+        def cached_revenue_by_region():
+            return revenue_by_region()
+
+        @st.cache_data(ttl=3600)
+        def cached_avg_by_segment():
+            return avg_by_segment()
+
+        @st.cache_data(ttl=3600)
+        def cached_count_by_channel():
+            return count_by_channel()
+
         if agg_type == "Total Revenue by Region":
-            if 'region' in df_data.columns and 'purchase_amount' in df_data.columns:
-                df_agg = df_data.groupby('region')['purchase_amount'].sum().reset_index()
+            df_agg = cached_revenue_by_region()
+            if not df_agg.empty:
                 fig = px.bar(df_agg, x='region', y='purchase_amount', title="Total Revenue by Region")
                 st.plotly_chart(fig)
             else:
                 st.warning("Data is missing 'region' or 'purchase_amount' columns.")
-        
+
         elif agg_type == "Average Purchase by Segment":
-            if 'customer_segment' in df_data.columns and 'purchase_amount' in df_data.columns:
-                df_agg = df_data.groupby('customer_segment')['purchase_amount'].mean().reset_index()
+            df_agg = cached_avg_by_segment()
+            if not df_agg.empty:
                 fig = px.pie(df_agg, values='purchase_amount', names='customer_segment', title="Average Purchase by Customer Segment")
                 st.plotly_chart(fig)
             else:
@@ -132,8 +166,8 @@ elif page == "Analytics Dashboard":
                 st.warning("Data is missing 'purchase_amount' column.")
         
         elif agg_type == "Customer Count by Channel":
-            if 'acquisition_channel' in df_data.columns:
-                df_agg = df_data.groupby('acquisition_channel')['customer_id'].nunique().reset_index()
+            df_agg = cached_count_by_channel()
+            if not df_agg.empty:
                 fig = px.bar(df_agg, x='acquisition_channel', y='customer_id', title="Customer Count by Acquisition Channel")
                 st.plotly_chart(fig)
             else:
@@ -143,4 +177,19 @@ elif page == "Analytics Dashboard":
         
         # --- Raw Data View ---
         st.subheader("Raw Customer Data")
-        st.dataframe(df_data)
\ No newline at end of file
+        # Only the first 1000 rows are shipped to the browser; the full
+        # table is available as a download instead of a giant grid.
+        st.dataframe(df_data.head(1000))
+        if len(df_data) > 1000:
+            st.caption(f"Showing the first 1,000 of {len(df_data):,} rows.")
+
+        @st.cache_data(ttl=3600, max_entries=1, show_spinner=False)
+        def full_csv_bytes():
+            return get_all_data_parquet().to_csv(index=False).encode('utf-8')
+
+        st.download_button(
+            "Download full CSV",
+            data=full_csv_bytes(),
+            file_name="customer_data.csv",
+            mime="text/csv",
+        )
\ No newline at end of file